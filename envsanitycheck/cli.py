@@ -1,10 +1,8 @@
 import os
 import sys
-import json
+import re
 import click
-from typing import List, Dict, Any, Tuple
-from ruamel.yaml import YAML 
-import io
+from typing import Dict, Any, Tuple, Optional
 
 # --- Configuration ---
 SPEC_FILE_NAME = "env.spec"
@@ -19,56 +17,152 @@ VALID_TYPES = {
     "boolean": bool
 }
 
+# Accepted (case-insensitive) spellings for the boolean type
+_BOOL_LITERALS = frozenset(('true', 'false', '1', '0'))
+
+# Characters that mean a spec line is real YAML rather than a flat `KEY: type` entry
+_YAML_SYNTAX_CHARS = frozenset('{}[]|>&*!\'"')
+_YAML_LINE_INDICATORS = frozenset('-?%@`')
+
+# One `KEY=value` assignment per line; blank and '#' comment lines never match
+# (input has LF line endings; surrounding Unicode whitespace is trimmed after decoding)
+_DOTENV_LINE_RE = re.compile(rb'^[^\S\n]*([^#\s=][^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$', re.MULTILINE)
+
+# Decimal/scientific notation plus the inf/nan spellings float() accepts
+_FLOAT_RE = re.compile(r'[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf(?:inity)?|nan)', re.IGNORECASE)
+
+_YAML = None
+
+
+def _yaml():
+    """Returns (yaml module, safe loader, safe dumper), importing PyYAML on first use and preferring its C classes."""
+    global _YAML
+    if _YAML is None:
+        import yaml  # Deferred: only needed for non-flat specs/reports
+
+        try:
+            from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+        except ImportError:
+            from yaml import SafeLoader as Loader, SafeDumper as Dumper
+
+        class UniqueKeyLoader(Loader):
+            """Safe loader that rejects repeated mapping keys instead of keeping the last value."""
+
+            def construct_mapping(self, node, deep=False):
+                seen = set()
+                for key_node, _ in node.value:
+                    # Merge keys (<<) are expanded by the base class and may legitimately be overridden
+                    if key_node.tag == 'tag:yaml.org,2002:merge':
+                        continue
+                    key = self.construct_object(key_node, deep=deep)
+                    if key in seen:
+                        raise ValueError(f"Variable '{key}' is defined more than once in the specification file.")
+                    seen.add(key)
+                return super().construct_mapping(node, deep=deep)
+
+        _YAML = (yaml, UniqueKeyLoader, Dumper)
+    return _YAML
+
+
+def _validate_string(value: str) -> Tuple[bool, str]:
+    # All non-empty values are valid strings
+    return True, ""
+
+
+def _validate_integer(value: str) -> Tuple[bool, str]:
+    # Check for float format in integer type
+    if '.' in value:
+        return False, f"Value '{value}' contains a decimal point. Expected strict integer."
+
+    digits = value[1:] if value[:1] in ('+', '-') else value
+    if not digits.isdecimal():
+        return False, f"Value '{value}' cannot be converted to type 'integer'."
+    return True, ""
+
+
+def _validate_float(value: str) -> Tuple[bool, str]:
+    if _FLOAT_RE.fullmatch(value) is None:
+        return False, f"Value '{value}' cannot be converted to type 'float'."
+    return True, ""
+
+
+def _validate_boolean(value: str) -> Tuple[bool, str]:
+    # Accept case-insensitive 'true', 'false', '1', '0'
+    if value.lower() not in _BOOL_LITERALS:
+        return False, f"Value '{value}' is not a valid boolean (expected true/false/1/0)."
+    return True, ""
+
+
+# Validator per spec type; load_spec_file guarantees only these keys reach check_value_type
+_VALIDATORS = {
+    "string": _validate_string,
+    "integer": _validate_integer,
+    "float": _validate_float,
+    "boolean": _validate_boolean,
+}
+
+
 def check_value_type(key: str, value: str, expected_type: str) -> Tuple[bool, str]:
     """Checks if the given value conforms to the expected type."""
-    if expected_type == 'string':
-        # All non-empty values are valid strings
-        return True, ""
-    
-    # Try type conversion for numerical and boolean types
-    try:
-        if expected_type == 'integer':
-            # Check for float format in integer type
-            if '.' in value:
-                 return False, f"Value '{value}' contains a decimal point. Expected strict integer."
-
-            int(value) # Will raise ValueError if conversion fails
-        elif expected_type == 'float':
-            float(value)
-        elif expected_type == 'boolean':
-            # Accept case-insensitive 'true', 'false', '1', '0'
-            lower_value = value.lower()
-            if lower_value not in ('true', 'false', '1', '0'):
-                return False, f"Value '{value}' is not a valid boolean (expected true/false/1/0)."
-        return True, ""
-    except ValueError:
-        return False, f"Value '{value}' cannot be converted to type '{expected_type}'."
-    except Exception as e:
-        return False, f"An unexpected error occurred during type check: {e}"
+    return _VALIDATORS[expected_type](value)
+
+
+def _parse_flat_spec(text: str) -> Optional[Dict[str, str]]:
+    """Parses a flat `KEY: type` spec without a YAML library. Returns None if the text needs a real YAML parser."""
+    data = {}
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if line[0] in ' \t' or stripped[0] in _YAML_LINE_INDICATORS or not _YAML_SYNTAX_CHARS.isdisjoint(stripped):
+            return None
+
+        key, sep, rest = stripped.partition(':')
+        key = key.strip()
+        # YAML only splits on ':' followed by whitespace, and '#' only starts a comment after whitespace
+        if not sep or not key or (rest and not rest[0].isspace()) or ' #' in key or '\t#' in key:
+            return None
+        type_name, hash_sign, _ = rest.partition('#')
+        if hash_sign and not type_name[-1:].isspace():
+            return None
+        type_name = type_name.strip()
+        if not type_name:
+            return None
+        if key in data:
+            raise ValueError(f"Variable '{key}' is defined more than once in the specification file.")
+
+        data[key] = type_name
+
+    return data or None
 
 
 def load_spec_file(spec_path: str) -> Dict[str, str]:
     """Loads required variables and their types from the env.spec YAML file."""
-    yaml = YAML()
     try:
-        with open(spec_path, 'r', encoding='utf-8') as f:
-            data = yaml.load(f)
+        # utf-8-sig drops the BOM that Notepad / PowerShell prepend, which the flat parser would keep
+        with open(spec_path, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+
+        # Plain `KEY: type` specs skip the YAML parser entirely
+        data = _parse_flat_spec(text)
+        if data is None:
+            yaml, loader, _ = _yaml()
+            data = yaml.load(text, Loader=loader)
         
         if not isinstance(data, dict):
              raise ValueError(f"Specification file '{spec_path}' content must be a dictionary (YAML object).")
 
-        # Normalize keys to strings, values (types) to lowercase strings
+        # Normalize keys to strings, values (types) to lowercase strings, validating types as we go
         normalized_data = {}
         for k, v in data.items():
-            if isinstance(v, str):
-                normalized_data[str(k).strip()] = v.lower().strip()
-            else:
+            if not isinstance(v, str):
                 raise ValueError(f"Type for variable '{k}' must be a string, not '{type(v).__name__}'.")
 
-        # Basic validation of types
-        for var, expected_type in normalized_data.items():
+            var = str(k).strip()
+            expected_type = v.lower().strip()
             if expected_type not in VALID_TYPES:
                  raise ValueError(f"Variable '{var}' specifies an unknown type: '{expected_type}'. Valid types are: {', '.join(VALID_TYPES.keys())}")
+            normalized_data[var] = expected_type
 
         return normalized_data
         
@@ -85,68 +179,147 @@ def load_dotenv_vars(dotenv_path: str) -> Dict[str, str]:
     dotenv_vars = {}
     if os.path.exists(dotenv_path):
         try:
-            with open(dotenv_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Basic parsing, handling key=value
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            key = key.strip()
-                            value = value.strip().strip('"').strip("'") # Simple removal of quotes
-                            if key:
-                                dotenv_vars[key] = value
+            # Read once as bytes; only the key/value slices that are kept get decoded
+            with open(dotenv_path, 'rb') as f:
+                # Normalise CRLF / CR-only line endings, as text mode's universal newlines did
+                content = f.read().replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+            for match in _DOTENV_LINE_RE.finditer(content):
+                # str.strip() also trims non-ASCII whitespace (e.g. NBSP) the bytes regex leaves in place
+                key = match.group(1).decode('utf-8').strip()
+                value = match.group(2).decode('utf-8').strip()
+                if not key or key.startswith('#'):
+                    continue
+                # Remove one pair of matching surrounding quotes
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+                    value = value[1:-1]
+                dotenv_vars[key] = value
         except Exception as e:
             click.echo(f"Warning: Could not parse .env file: {e}", err=True)
     return dotenv_vars
 
+# Fixed first/last lines of the text report
+TEXT_REPORT_HEADER = "\n--- 🛡️ EnvSanityCheck: Starting Sanity Check ---\n"
+TEXT_REPORT_FOOTER = "\n--- EnvSanityCheck: Finished ---\n"
+
+# Report layout used by the hand-rolled YAML emitter (key order matters)
+REPORT_KEYS = ('status', 'required_count', 'found_count', 'missing', 'empty', 'type_errors', 'all_checks_passed')
+TYPE_ERROR_KEYS = ('key', 'expected', 'actual_value', 'message')
+
+# Strings matching this can be emitted as plain YAML scalars without quoting
+_YAML_PLAIN = re.compile(r'[A-Za-z_](?:[\w./\- ]*[\w./\-])?\Z')
+_YAML_RESERVED = frozenset(('y', 'n', 'yes', 'no', 'on', 'off', 'true', 'false', 'null'))
+# Characters that must be escaped inside a double-quoted scalar: C0/C1 controls, surrogates, and the
+# Unicode line separators / non-characters a YAML reader rejects or folds
+_YAML_ESCAPE = re.compile(r'[\\"\x00-\x1f\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]')
+_YAML_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+
+
+def _yaml_escape_char(match: "re.Match") -> str:
+    """Returns the YAML double-quoted escape sequence for one matched character."""
+    char = match.group()
+    if char in _YAML_ESCAPES:
+        return _YAML_ESCAPES[char]
+    code = ord(char)
+    return f"\\x{code:02x}" if code < 0x100 else f"\\u{code:04x}"
+
+
+def _yaml_scalar(value: Any) -> str:
+    """Renders a single scalar value as YAML, double-quoting strings only when needed."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+
+    value = str(value)
+    if _YAML_PLAIN.match(value) and value.lower() not in _YAML_RESERVED:
+        return value
+
+    escaped = _YAML_ESCAPE.sub(_yaml_escape_char, value)
+    return f'"{escaped}"'
+
+
+def emit_report_yaml(data: Dict[str, Any]) -> str:
+    """Emits the fixed-shape check report as YAML without going through a YAML library."""
+    lines = []
+    for key in REPORT_KEYS:
+        value = data[key]
+        if key == 'type_errors':
+            if not value:
+                lines.append(f"{key}: []")
+                continue
+            lines.append(f"{key}:")
+            for error in value:
+                for i, field in enumerate(TYPE_ERROR_KEYS):
+                    indent = "  - " if i == 0 else "    "
+                    lines.append(f"{indent}{field}: {_yaml_scalar(error[field])}")
+        elif isinstance(value, list):
+            if not value:
+                lines.append(f"{key}: []")
+                continue
+            lines.append(f"{key}:")
+            for item in value:
+                lines.append(f"  - {_yaml_scalar(item)}")
+        else:
+            lines.append(f"{key}: {_yaml_scalar(value)}")
+
+    lines.append("")
+    return "\n".join(lines)
+
+
 def format_output(data: Dict[str, Any], output_format: str) -> str:
     """Formats the check report based on the requested output format."""
     
+    # json/yaml are imported lazily so the default text report does not pay for them
     if output_format == 'json':
-        return json.dumps(data, indent=4)
+        # orjson is an optional extra (envsanitycheck[fast]); stdlib json is the fallback
+        try:
+            import orjson
+        except ImportError:
+            import json
+            return json.dumps(data, indent=4)
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
     
     if output_format == 'yaml':
-        yaml = YAML()
-        yaml.indent(mapping=2, sequence=4, offset=2)
-        
-        # Prepare YAML output string
-        output_buffer = io.StringIO()
-        yaml.dump(data, output_buffer)
-        return output_buffer.getvalue()
+        # Fast path for the known report shape; PyYAML only handles anything unexpected
+        if set(data) == set(REPORT_KEYS) and all(set(e) == set(TYPE_ERROR_KEYS) for e in data['type_errors']):
+            return emit_report_yaml(data)
+
+        yaml, _, dumper = _yaml()
+        return yaml.dump(data, Dumper=dumper, default_flow_style=False, sort_keys=False, indent=2)
 
     # Default 'text' format
-    report = f"\n--- 🛡️ EnvSanityCheck: Starting Sanity Check ---\n"
+    out = [TEXT_REPORT_HEADER]
     
     if data['status'] == 'SUCCESS':
-        report += f"\n✅ SUCCESS! All {data['required_count']} required variables are set correctly."
+        out.append(f"\n✅ SUCCESS! All {data['required_count']} required variables are set correctly.")
     else:
-        report += "\n❌ VALIDATION FAILURE:\n"
+        out.append("\n❌ VALIDATION FAILURE:\n")
         
         if data['missing']:
-            report += "\n❌ MISSING VARIABLES:\n"
+            out.append("\n❌ MISSING VARIABLES:\n")
             for var in data['missing']:
-                report += f"  - {var}\n"
-            report += "  -> Please add these variables to your environment or .env file.\n"
+                out.append(f"  - {var}\n")
+            out.append("  -> Please add these variables to your environment or .env file.\n")
 
         if data['empty']:
-            report += "\n⚠️ EMPTY VARIABLES:\n"
+            out.append("\n⚠️ EMPTY VARIABLES:\n")
             for var in data['empty']:
-                report += f"  - {var}\n"
-            report += "  -> These variables are set but empty. They must have a value.\n"
+                out.append(f"  - {var}\n")
+            out.append("  -> These variables are set but empty. They must have a value.\n")
 
         if data['type_errors']:
-            report += "\n⚠️ TYPE MISMATCH ERRORS:\n"
+            out.append("\n⚠️ TYPE MISMATCH ERRORS:\n")
             for error in data['type_errors']:
-                report += f"  - {error['key']} | Expected: {error['expected']} | Found: '{error['actual_value']}'\n"
-                report += f"    Reason: {error['message']}\n"
+                out.append(f"  - {error['key']} | Expected: {error['expected']} | Found: '{error['actual_value']}'\n")
+                out.append(f"    Reason: {error['message']}\n")
 
-        report += f"\n--- EnvSanityCheck: {len(data['missing'])} Missing, {len(data['empty'])} Empty, {len(data['type_errors'])} Type Errors (Total Errors: {len(data['missing']) + len(data['empty']) + len(data['type_errors'])}) ---\n"
-        report += "Please fix the errors listed above."
+        out.append(f"\n--- EnvSanityCheck: {len(data['missing'])} Missing, {len(data['empty'])} Empty, {len(data['type_errors'])} Type Errors (Total Errors: {len(data['missing']) + len(data['empty']) + len(data['type_errors'])}) ---\n")
+        out.append("Please fix the errors listed above.")
 
-    report += "\n--- EnvSanityCheck: Finished ---\n"
+    out.append(TEXT_REPORT_FOOTER)
     
-    return report
+    return ''.join(out)
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option('--spec', default=SPEC_FILE_NAME, help='Name of the specification file listing required variables. Default: env.spec')
@@ -158,22 +331,32 @@ def envsanitycheck(spec: str, format: str):
     
     required_vars_with_types = load_spec_file(spec)
 
-    # Load variables from .env file and then os.environ (OS environment wins)
+    # Load variables from .env file; os.environ is consulted per variable (OS environment wins)
     dotenv_vars = load_dotenv_vars(DOTENV_FILE_NAME)
-    all_available_vars = {**dotenv_vars, **os.environ}
     
     missing_vars = []
     empty_vars = []
     type_errors = []
     found_count = 0
+
+    # Bind the lookups once for the loop below
+    environ_get = os.environ.get
+    dotenv_get = dotenv_vars.get
     
     for var, expected_type in required_vars_with_types.items():
-        if var not in all_available_vars:
+        # Neither mapping stores None, so it marks a missing variable
+        value = environ_get(var)
+        if value is None:
+            value = dotenv_get(var)
+
+        if value is None:
             missing_vars.append(var)
         else:
-            value = all_available_vars[var]
             if not value:
                 empty_vars.append(var)
+            elif expected_type == 'string':
+                # Any non-empty value is a valid string; skip the type check call
+                found_count += 1
             else:
                 # New: Type Check
                 is_valid, message = check_value_type(var, value, expected_type)
@@ -197,7 +380,8 @@ def envsanitycheck(spec: str, format: str):
     
     # Output the report
     report = format_output(report_data, format)
-    click.echo(report)
+    sys.stdout.write(report + "\n")
+    sys.stdout.flush()
     
     # Exit with appropriate code for CI/CD pipeline
     if is_failing:
@@ -4,7 +4,7 @@ import os
 # --- 1. Dependencies List ---
 REQUIRED_PACKAGES = [
     'click',
-    'ruamel.yaml', 
+    'PyYAML',
 ]
 
 # --- 2. README.md Load ---
@@ -20,6 +20,9 @@ setup(
     packages=find_packages(), 
     # 3. Dependencies
     install_requires=REQUIRED_PACKAGES,
+    extras_require={
+        'fast': ['orjson'],  # Faster JSON report output
+    },
     
     # 4. Metadata
     author='Lokesh Kumar',
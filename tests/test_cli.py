@@ -1,82 +1,192 @@
 # tests/test_cli.py
 
-import pytest
-import os
+from pytest import fixture, mark, raises
+import json
+import yaml
 from click.testing import CliRunner
-from envsanitycheck.cli import envsanitycheck, check_value_type
+from envsanitycheck.cli import envsanitycheck, check_value_type, emit_report_yaml, load_dotenv_vars, load_spec_file
 
 # --- 1. Testing Core Logic: check_value_type ---
 
 # Test cases for successful type validation
-@pytest.mark.parametrize("value, expected_type", [
+_SUCCESS_CASES = [
     ("hello", "string"),
     ("123", "integer"),
+    ("-42", "integer"),
     ("3.14", "float"),
+    ("-1e-3", "float"),
+    (".5", "float"),
+    ("inf", "float"),
     ("True", "boolean"),
     ("false", "boolean"),
     ("1", "boolean"),
     ("0", "boolean"),
-])
-def test_check_value_type_success(value, expected_type):
-    """Tests if valid values pass type checks."""
-    is_valid, message = check_value_type("KEY", value, expected_type)
-    assert is_valid is True
-    assert message == ""
+]
 
 # Test cases for failing type validation
-@pytest.mark.parametrize("value, expected_type", [
+_FAILURE_CASES = [
     ("abc", "integer"),  # String instead of Integer
     ("abc", "float"),    # String instead of Float
+    ("+", "integer"),    # Sign without digits
+    ("1.2.3", "float"),  # Malformed decimal
+    ("1e", "float"),     # Exponent without digits
     ("yes", "boolean"),  # Invalid boolean
     ("1.0", "integer"),  # Float instead of Integer (should fail strict int check)
-])
-def test_check_value_type_failure(value, expected_type):
+]
+
+# The cases are looped over in one test each rather than parametrized, to avoid a test node per case
+def test_check_value_type_success():
+    """Tests if valid values pass type checks."""
+    results = [(value, expected_type, check_value_type("KEY", value, expected_type)) for value, expected_type in _SUCCESS_CASES]
+    unexpected = [r for r in results if r[2] != (True, "")]
+    assert not unexpected, unexpected
+
+def test_check_value_type_failure():
     """Tests if invalid values fail type checks and return a message."""
-    is_valid, message = check_value_type("KEY", value, expected_type)
-    assert is_valid is False
-    assert message != ""
+    results = [(value, expected_type, check_value_type("KEY", value, expected_type)) for value, expected_type in _FAILURE_CASES]
+    unexpected = [r for r in results if r[2][0] is not False or not r[2][1]]
+    assert not unexpected, unexpected
+
+# Test that the hand-rolled YAML report parses back to the original data
+def test_emit_report_yaml_round_trip():
+    """Tests that values needing quotes or escapes (numbers, booleans, colons, control characters) survive the YAML emitter."""
+    data = {
+        "status": "FAILURE",
+        "required_count": 3,
+        "found_count": 0,
+        "missing": ["API_KEY"],
+        "empty": [],
+        "type_errors": [
+            {"key": "PORT", "expected": "integer", "actual_value": "1.0", "message": "Value '1.0': bad"},
+            {"key": "DEBUG", "expected": "boolean", "actual_value": "yes", "message": "tab\there"},
+            # C1 controls (NEL folds to a space if left raw) and a lone surrogate from an undecodable env byte
+            {"key": "RAW", "expected": "integer", "actual_value": "nel\x85c1\x9fsur\udcff", "message": "sep\u2028end"},
+        ],
+        "all_checks_passed": False,
+    }
+    assert yaml.safe_load(emit_report_yaml(data)) == data
+
+# Test .env parsing: comments, blanks, line endings, whitespace and one pair of surrounding quotes
+def test_load_dotenv_vars(tmp_path):
+    """Tests CRLF/CR-only lines, Unicode whitespace trimming and that only a matching pair of outer quotes is removed."""
+    dotenv_file = tmp_path / ".env"
+    dotenv_file.write_text("# comment\n  # INDENTED=comment\n\nPLAIN=value\nCRLF = spaced \r\nCR_ONLY=first\rAFTER_CR=second\n"
+                           "\fFORMFEED=ff\v\nNBSP=\u00a0padded\u00a0\n\u00a0# NBSP_COMMENT=x\n"
+                           "DOUBLE=\"quoted\"\nNESTED='\"inner\"'\nUNBALANCED=\"open\n", encoding="utf-8")
+
+    assert load_dotenv_vars(str(dotenv_file)) == {
+        "PLAIN": "value",
+        "CRLF": "spaced",
+        "CR_ONLY": "first",
+        "AFTER_CR": "second",
+        "FORMFEED": "ff",
+        "NBSP": "padded",
+        "DOUBLE": "quoted",
+        "NESTED": '"inner"',
+        "UNBALANCED": '"open',
+    }
+
+# Test that flat specs and specs needing the YAML parser load the same way
+_LOADED_SPEC = {"API_KEY": "string", "SERVICE_PORT": "integer"}
+
+@mark.parametrize("spec_text, expected", [
+    ("# spec\nAPI_KEY: string\nSERVICE_PORT: Integer  # inline comment\n", _LOADED_SPEC),
+    ("{API_KEY: string, SERVICE_PORT: 'integer'}", _LOADED_SPEC),
+    ("\ufeffAPI_KEY: string\nSERVICE_PORT: integer\n", _LOADED_SPEC),  # UTF-8 BOM as written by Notepad/PowerShell
+    ("API_KEY: string\nAPI_KEY: integer\n", SystemExit),  # Duplicate key, flat parser
+    ("{API_KEY: string, API_KEY: integer}", SystemExit),  # Duplicate key, YAML fallback
+    ("API_KEY # note: string\n", SystemExit),  # '#' after whitespace comments out the rest of the line
+])
+def test_load_spec_file(tmp_path, spec_text, expected):
+    """Tests spec loading through both the flat-line parser and the YAML fallback, including rejected specs."""
+    spec_file = tmp_path / "env.spec"
+    spec_file.write_text(spec_text, encoding="utf-8")
+
+    if expected is SystemExit:
+        with raises(SystemExit):
+            load_spec_file(str(spec_file))
+    else:
+        assert load_spec_file(str(spec_file)) == expected
 
 # --- 2. Testing CLI Command (Integration) ---
 
-@pytest.fixture
+# Spec file contents for the shared CLI scenarios
+_SUCCESS_SPEC = b"API_KEY: string\nSERVICE_PORT: integer"
+_MISSING_SPEC = b"REQUIRED_BUT_MISSING: string"
+_SUCCESS_OUTPUT = (b"SUCCESS", b"All 2 required variables are set correctly.")
+
+@fixture(scope="session")
 def runner():
-    """Provides the CliRunner for testing the command line interface."""
+    """Provides the CliRunner for testing the command line interface (stateless, so shared)."""
     return CliRunner()
 
+@fixture(scope="session")
+def success_spec(tmp_path_factory):
+    """Writes the spec for the successful run once per session and returns its path."""
+    spec_file = tmp_path_factory.mktemp("success") / "env.spec"
+    spec_file.write_bytes(_SUCCESS_SPEC)
+    return str(spec_file)
+
+@fixture(scope="session")
+def missing_spec(tmp_path_factory):
+    """Writes a spec requiring a variable that is never set, once per session."""
+    spec_file = tmp_path_factory.mktemp("missing") / "env.spec"
+    spec_file.write_bytes(_MISSING_SPEC)
+    return str(spec_file)
+
 # Test case for a successful run (No errors)
-def test_cli_success(runner, tmp_path):
+def test_cli_success(runner, success_spec, monkeypatch):
     """Mocks environment and spec file for a successful run."""
-    # 1. Create temporary env.spec file
-    spec_file = tmp_path / "env.spec"
-    spec_file.write_text("API_KEY: string\nSERVICE_PORT: integer")
-
-    # 2. Mock environment variables for the test
-    os.environ['API_KEY'] = 'test-key'
-    os.environ['SERVICE_PORT'] = '8000'
+    # 1. Mock environment variables for the test
+    monkeypatch.setenv('API_KEY', 'test-key')
+    monkeypatch.setenv('SERVICE_PORT', '8000')
 
-    # 3. Run the CLI command
-    result = runner.invoke(envsanitycheck, ['--spec', str(spec_file)])
+    # 2. Run the CLI command
+    result = runner.invoke(envsanitycheck, ['--spec', success_spec])
 
-    # 4. Assertions
+    # 3. Assertions
     assert result.exit_code == 0
-    assert "SUCCESS" in result.output
-    assert "All 2 required variables are set correctly." in result.output
-
-    # Cleanup (important for os.environ)
-    del os.environ['API_KEY']
-    del os.environ['SERVICE_PORT']
+    # Expected fragments, in output order, found with a single forward scan
+    out = result.stdout_bytes
+    pos = 0
+    for expected in _SUCCESS_OUTPUT:
+        found = out.find(expected, pos)
+        assert found >= 0, expected
+        pos = found + len(expected)
 
 
 # Test case for a failing run (Missing Variable)
-def test_cli_failure_missing_var(runner, tmp_path):
+def test_cli_failure_missing_var(runner, missing_spec):
     """Tests CLI failure when a required variable is missing."""
-    spec_file = tmp_path / "env.spec"
-    spec_file.write_text("REQUIRED_BUT_MISSING: string")
-
     # Run the CLI command
-    result = runner.invoke(envsanitycheck, ['--spec', str(spec_file)])
+    result = runner.invoke(envsanitycheck, ['--spec', missing_spec])
 
     # Assertions
     assert result.exit_code == 1 # Command must exit with failure
-    assert "❌ MISSING VARIABLES:" in result.output
-    assert "REQUIRED_BUT_MISSING" in result.output
+    assert "❌ MISSING VARIABLES:".encode("utf-8") in result.stdout_bytes
+    assert b"REQUIRED_BUT_MISSING" in result.stdout_bytes
+
+
+# Test case for variables coming from the .env file, overridden by the OS environment
+def test_cli_dotenv_and_os_precedence(runner, tmp_path, monkeypatch):
+    """Tests that .env fills in missing variables and os.environ wins on conflicts."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "env.spec").write_text("DOTENV_ONLY_KEY: string\nOVERRIDDEN_PORT: integer")
+    (tmp_path / ".env").write_text("DOTENV_ONLY_KEY=from-dotenv\nOVERRIDDEN_PORT=eighty")
+    monkeypatch.setenv('OVERRIDDEN_PORT', '8000')
+
+    result = runner.invoke(envsanitycheck, ['--spec', 'env.spec'])
+
+    assert result.exit_code == 0
+    assert b"All 2 required variables are set correctly." in result.stdout_bytes
+
+
+# Test case for structured JSON output (works with or without orjson installed)
+def test_cli_json_output(runner, missing_spec):
+    """Tests that the JSON report is valid JSON describing the failure."""
+    result = runner.invoke(envsanitycheck, ['--spec', missing_spec, '--format', 'json'])
+
+    assert result.exit_code == 1
+    report = json.loads(result.stdout_bytes)
+    assert report["status"] == "FAILURE"
+    assert report["missing"] == ["REQUIRED_BUT_MISSING"]